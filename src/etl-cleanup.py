@@ -4,6 +4,12 @@ import json
 from datetime import datetime
 import logging
 
+from etl_sinks import write_output
+from etl_quality import CUSTOMER_360_RULES, check_dataframe, save_report
+from etl_dates import DateNormaliser, normalise_dates
+from etl_metrics import PipelineMetrics
+from etl_schema import CRM_SCHEMA, ORDERS_SCHEMA, SUPPORT_SCHEMA, CUSTOMER_360_SCHEMA, apply_schema
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
@@ -51,10 +57,17 @@ support_data = {
     'created_date': ['2023-04-01', '2023-04-15', '2023-05-01', '2023-05-15']
 }
 
+# Data quality settings - see etl_quality.py for the rules
+FAIL_ON_QUALITY_THRESHOLDS = False    # True stops the pipeline when a rule breaches max_failed_pct
+QUALITY_REPORT_FILE = 'data_quality_report.json'
+
 # ===============================
 # TRANSFORM: Your challenge starts here!
 # ===============================
 
+# Shared so a date string seen in one system isn't parsed again in another
+date_normaliser = DateNormaliser()
+
 def clean_crm_data(data):
     """
     Clean and standardise CRM data
@@ -66,8 +79,11 @@ def clean_crm_data(data):
     - Parse various date formats
     - Standardise status values
     """
-    df = pd.DataFrame(data)
+    df = apply_schema(pd.DataFrame(data), CRM_SCHEMA, 'crm')
     logger.info(f"CRM data loaded: {len(df)} records")
+
+    # Mixed date formats -> datetime; unparseable values go to registration_date_reject
+    df = normalise_dates(df, 'registration_date', date_normaliser)
     
     # YOUR CODE HERE
     # Hint: You'll need to handle each column's specific issues
@@ -90,7 +106,11 @@ def process_orders_data(json_string):
     # YOUR CODE HERE
     # Hint: You'll need to normalise the schema first
     
-    return pd.DataFrame(orders)
+    df = apply_schema(pd.DataFrame(orders), ORDERS_SCHEMA, 'orders')
+    for date_column in ['date', 'order_date']:
+        if date_column in df.columns:
+            df = normalise_dates(df, date_column, date_normaliser)
+    return df
 
 def enrich_with_support_data(customer_df, support_dict):
     """
@@ -100,7 +120,7 @@ def enrich_with_support_data(customer_df, support_dict):
     - Identify high-priority customers
     - Calculate days since last support contact
     """
-    support_df = pd.DataFrame(support_dict)
+    support_df = apply_schema(pd.DataFrame(support_dict), SUPPORT_SCHEMA, 'support')
     logger.info(f"Support data loaded: {len(support_df)} records")
     
     # YOUR CODE HERE
@@ -127,48 +147,64 @@ def create_customer_360_view(crm_df, orders_df, support_df):
 def validate_final_data(df):
     """
     Perform data quality checks on final dataset
-    TODO: Implement validation logic
     - Check for duplicates
     - Validate required fields
     - Check data consistency
     - Generate quality report
+    Rules live in etl_quality.CUSTOMER_360_RULES
     """
     logger.info("Validating final dataset...")
-    
-    # YOUR CODE HERE
-    # What business rules should we enforce?
-    
-    return True
+
+    report = check_dataframe(df, CUSTOMER_360_RULES, fail_on_threshold=FAIL_ON_QUALITY_THRESHOLDS)
+    for rule in report['rules']:
+        if rule['passed'] is False:
+            logger.warning(f"Rule {rule['name']} failed for {rule['failed']} rows ({rule['failed_pct']}%)")
+    if QUALITY_REPORT_FILE:
+        save_report(report, QUALITY_REPORT_FILE)
+
+    return report['passed']
 
 # ===============================
 # MAIN ETL PIPELINE
 # ===============================
 
+# Output settings - see etl_sinks.py for the available formats
+OUTPUT_FORMAT = 'csv'         # 'csv', 'parquet' or 'feather'
+OUTPUT_PARTITION_BY = None    # e.g. 'segment' or ['segment', 'region']
+OUTPUT_DTYPES = CUSTOMER_360_SCHEMA    # see etl_schema.py
+
+# Metrics settings - see etl_metrics.py
+METRICS_FILE = None    # e.g. 'customer_360.prom' for the node_exporter textfile collector
+
 def run_etl_pipeline():
     """Main ETL orchestration function"""
+    metrics = PipelineMetrics('customer_360')
     try:
         logger.info("Starting ETL pipeline...")
         
         # Extract
         logger.info("=== EXTRACT PHASE ===")
-        crm_df = clean_crm_data(crm_data)
-        orders_df = process_orders_data(orders_json)
-        support_df = pd.DataFrame(support_data)
+        crm_df = metrics.run(clean_crm_data, crm_data)
+        orders_df = metrics.run(process_orders_data, orders_json)
+        support_df = apply_schema(pd.DataFrame(support_data), SUPPORT_SCHEMA, 'support')
         
         # Transform
         logger.info("=== TRANSFORM PHASE ===")
-        enriched_crm = enrich_with_support_data(crm_df, support_data)
-        final_df = create_customer_360_view(enriched_crm, orders_df, support_df)
+        enriched_crm = metrics.run(enrich_with_support_data, crm_df, support_data)
+        final_df = metrics.run(create_customer_360_view, enriched_crm, orders_df, support_df)
         
         # Validate
         logger.info("=== VALIDATION PHASE ===")
-        if validate_final_data(final_df):
+        if metrics.run(validate_final_data, final_df):
             logger.info("Data validation passed!")
         
         # Load
         logger.info("=== LOAD PHASE ===")
-        output_file = f"customer_360_view_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        final_df.to_csv(output_file, index=False)
+        output_base = f"customer_360_view_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        with metrics.stage('load', rows_in=len(final_df)) as stage:
+            output_file = write_output(final_df, output_base, fmt=OUTPUT_FORMAT,
+                                       dtypes=OUTPUT_DTYPES, partition_by=OUTPUT_PARTITION_BY)
+            stage['rows_out'] = len(final_df)
         logger.info(f"Pipeline completed! Output saved to {output_file}")
         
         return final_df
@@ -177,6 +213,10 @@ def run_etl_pipeline():
         logger.error(f"Pipeline failed: {str(e)}")
         raise
 
+    finally:
+        if METRICS_FILE:
+            metrics.write_prometheus(METRICS_FILE)
+
 # ===============================
 # DISCUSSION QUESTIONS
 # ===============================
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+ETL Metrics
+Per-stage instrumentation for ETL pipelines.
+
+Each stage records wall time, rows in and out, rejected rows, process
+peak RSS and DataFrame memory. Every stage is logged as one JSON line,
+and the whole run can be written as a Prometheus text file (e.g. for the
+node_exporter textfile collector).
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import tempfile
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then left out
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# ===============================
+# MEASUREMENTS
+# ===============================
+
+def peak_rss_bytes():
+    """High-water mark of this process's resident memory, or None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def count_rows(data):
+    """Row count for a DataFrame, dict of columns or list of records"""
+    if isinstance(data, (pd.DataFrame, pd.Series, list)):
+        return len(data)
+    if isinstance(data, dict) and data:
+        first = next(iter(data.values()))
+        if isinstance(first, (list, tuple, pd.Series)):
+            return len(first)
+    return None
+
+def count_rejected(df, existing_columns=()):
+    """
+    Rows with a value in any *_reject column (see etl_dates.normalise_dates),
+    ignoring reject columns that already came in from an earlier stage
+    """
+    if not isinstance(df, pd.DataFrame):
+        return None
+    reject_columns = [col for col in df.columns
+                      if str(col).endswith('_reject') and col not in existing_columns]
+    if not reject_columns:
+        return 0
+    return int(df[reject_columns].notna().any(axis=1).sum())
+
+def dataframe_memory_bytes(df):
+    if not isinstance(df, pd.DataFrame):
+        return None
+    return int(df.memory_usage(deep=True).sum())
+
+# ===============================
+# RECORDER
+# ===============================
+
+class PipelineMetrics:
+    """Collects stage records for one pipeline run"""
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Time a block of code as one stage. The yielded record can be updated
+        inside the block, e.g. record['rows_out'] = len(df).
+        """
+        record = {
+            'pipeline': self.pipeline,
+            'stage': name,
+            'status': 'running',
+            'rows_in': rows_in,
+            'rows_out': None,
+            'rows_rejected': None,
+            'dataframe_memory_bytes': None,
+        }
+        start = time.perf_counter()
+        try:
+            yield record
+            record['status'] = 'success'
+        except Exception:
+            record['status'] = 'failed'
+            raise
+        finally:
+            record['duration_seconds'] = round(time.perf_counter() - start, 6)
+            record['peak_rss_bytes'] = peak_rss_bytes()
+            self.stages.append(record)
+            logger.info(json.dumps(record))
+
+    def run(self, func, *args, **kwargs):
+        """
+        Call func(*args, **kwargs) as a stage named after the function.
+        Rows in are counted from the first argument and rows out, rejects
+        and memory from the result.
+        """
+        if not args:
+            raise ValueError(f"Stage {func.__name__} needs its input as the first argument")
+        rows_in = count_rows(args[0])
+        with self.stage(func.__name__, rows_in=rows_in) as record:
+            result = func(*args, **kwargs)
+            record['rows_out'] = count_rows(result)
+            record['dataframe_memory_bytes'] = dataframe_memory_bytes(result)
+
+            existing_columns = args[0].columns if isinstance(args[0], pd.DataFrame) else ()
+            rejected = count_rejected(result, existing_columns)
+            if rows_in is not None and record['rows_out'] is not None:
+                # Dropped rows count as rejected too
+                rejected = (rejected or 0) + max(rows_in - record['rows_out'], 0)
+            record['rows_rejected'] = rejected
+        return result
+
+    def to_prometheus(self):
+        """Prometheus text exposition format for every recorded stage"""
+        metrics = [
+            ('etl_stage_duration_seconds', 'duration_seconds', 'Wall time of the ETL stage'),
+            ('etl_stage_rows_in', 'rows_in', 'Rows passed into the ETL stage'),
+            ('etl_stage_rows_out', 'rows_out', 'Rows returned by the ETL stage'),
+            ('etl_stage_rows_rejected', 'rows_rejected', 'Rows rejected or dropped by the ETL stage'),
+            ('etl_stage_peak_rss_bytes', 'peak_rss_bytes', 'Process peak RSS at the end of the ETL stage'),
+            ('etl_stage_dataframe_memory_bytes', 'dataframe_memory_bytes', 'Deep memory usage of the stage output'),
+        ]
+        lines = []
+        for metric, key, help_text in metrics:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for stage in self.stages:
+                if stage[key] is not None:
+                    lines.append(f'{metric}{{pipeline="{self.pipeline}",stage="{stage["stage"]}"}} {stage[key]}')
+
+        lines.append("# HELP etl_stage_success 1 if the ETL stage succeeded, 0 if it failed")
+        lines.append("# TYPE etl_stage_success gauge")
+        for stage in self.stages:
+            success = 1 if stage['status'] == 'success' else 0
+            lines.append(f'etl_stage_success{{pipeline="{self.pipeline}",stage="{stage["stage"]}"}} {success}')
+
+        lines.append("# HELP etl_last_run_timestamp_seconds Unix time the metrics were written")
+        lines.append("# TYPE etl_last_run_timestamp_seconds gauge")
+        lines.append(f'etl_last_run_timestamp_seconds{{pipeline="{self.pipeline}"}} {int(time.time())}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Write the Prometheus file atomically so scrapers never read half a file"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.prom')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        logger.info(f"Metrics saved to {path}")
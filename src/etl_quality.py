@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Data Quality Rules
+Declarative data-quality checks for ETL outputs.
+
+Rules are plain dicts, e.g.
+    {'name': 'email_format', 'type': 'regex', 'column': 'email', 'pattern': r'[^@\s]+@[^@\s]+\.[^@\s]+'}
+
+Every rule is evaluated as one vectorised boolean mask ("row fails") and
+the masks are reduced together, so the data is never looped over row by
+row. Large inputs can be checked chunk by chunk with check_chunks.
+"""
+
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+from etl_schema import as_string
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_SIZE = 5
+
+# Rules for the customer-360 view built by etl-cleanup.py
+CUSTOMER_360_RULES = [
+    {'name': 'customer_id_required', 'type': 'required', 'column': 'customer_id', 'max_failed_pct': 0},
+    {'name': 'customer_id_unique', 'type': 'unique', 'column': 'customer_id', 'max_failed_pct': 0},
+    {'name': 'first_name_required', 'type': 'required', 'column': 'first_name'},
+    {'name': 'last_name_required', 'type': 'required', 'column': 'last_name'},
+    {'name': 'email_format', 'type': 'regex', 'column': 'email',
+     'pattern': r'[^@\s]+@[^@\s]+\.[^@\s]+', 'max_failed_pct': 20},
+    {'name': 'phone_uk_format', 'type': 'regex', 'column': 'phone', 'pattern': r'0\d{10}', 'max_failed_pct': 20},
+    {'name': 'status_allowed', 'type': 'allowed', 'column': 'status',
+     'values': ['active', 'inactive', 'suspended', 'unknown']},
+    {'name': 'total_spent_not_negative', 'type': 'consistency', 'expression': 'total_spent >= 0'},
+    {'name': 'no_spend_without_orders', 'type': 'consistency',
+     'expression': '(order_count > 0) | (total_spent == 0)'},
+]
+
+class DataQualityError(Exception):
+    """Raised when a rule fails more rows than its max_failed_pct allows"""
+
+    def __init__(self, report):
+        self.report = report
+        failed = [rule['name'] for rule in report['rules'] if rule['passed'] is False]
+        super().__init__(f"Data quality thresholds breached: {', '.join(failed)}")
+
+# ===============================
+# RULE MASKS (True = row fails)
+# ===============================
+
+def required_mask(df, rule):
+    series = df[rule['column']]
+    mask = series.isna()
+    if not pd.api.types.is_numeric_dtype(series):
+        mask |= as_string(series).str.strip().eq('').fillna(False)
+    return mask
+
+def regex_mask(df, rule):
+    # Missing values are the required rule's job, not this one's
+    series = as_string(df[rule['column']])
+    present = series.str.strip().ne('').fillna(False).astype(bool)
+    matches = series.str.fullmatch(rule['pattern']).fillna(True).astype(bool)
+    return present & ~matches
+
+def allowed_mask(df, rule):
+    series = df[rule['column']]
+    return series.notna() & ~series.isin(rule['values'])
+
+def unique_mask(df, rule, seen=None):
+    """
+    The first occurrence is fine; later repeats fail. seen, if given, is a
+    set of values from earlier chunks and is updated in place.
+    """
+    series = df[rule['column']]
+    mask = series.duplicated(keep='first') & series.notna()
+    if seen is None:
+        return mask
+
+    # Hash lookups on this chunk's distinct values only, so cost doesn't grow with seen
+    values = series.dropna().unique().tolist()
+    repeated = [value for value in values if value in seen]
+    if repeated:
+        mask |= series.isin(repeated)
+    seen.update(values)
+    return mask
+
+def consistency_mask(df, rule):
+    valid = df.eval(rule['expression'])
+    return ~pd.Series(valid, index=df.index).fillna(False).astype(bool)
+
+RULE_TYPES = {
+    'required': required_mask,
+    'regex': regex_mask,
+    'allowed': allowed_mask,
+    'unique': unique_mask,
+    'consistency': consistency_mask,
+}
+
+def _rule_columns(rule):
+    if 'column' in rule:
+        return [rule['column']]
+    return []
+
+# ===============================
+# ENGINE
+# ===============================
+
+class QualityChecker:
+    """Accumulates rule results over one DataFrame or many chunks"""
+
+    def __init__(self, rules, sample_size=SAMPLE_SIZE, chunked=True):
+        for rule in rules:
+            if rule['type'] not in RULE_TYPES:
+                raise ValueError(f"Unknown rule type '{rule['type']}' in rule '{rule['name']}'")
+        self.rules = rules
+        self.sample_size = sample_size
+        self.rows = 0
+        self.failed = np.zeros(len(rules), dtype=np.int64)
+        self.samples = [[] for _ in rules]
+        self.skipped = {}
+        # column -> set of values already seen, for unique rules across chunks
+        self.seen = {} if chunked else None
+
+    def _mask(self, df, rule):
+        if rule['type'] == 'unique':
+            seen = None if self.seen is None else self.seen.setdefault(rule['column'], set())
+            return unique_mask(df, rule, seen)
+        return RULE_TYPES[rule['type']](df, rule)
+
+    def check(self, df):
+        """Evaluate every rule against df (one chunk) and add to the totals"""
+        masks = np.zeros((len(df), len(self.rules)), dtype=bool)
+        for i, rule in enumerate(self.rules):
+            missing = [col for col in _rule_columns(rule) if col not in df.columns]
+            if missing:
+                self.skipped[rule['name']] = f"missing column(s): {', '.join(missing)}"
+                continue
+            try:
+                masks[:, i] = np.asarray(self._mask(df, rule), dtype=bool)
+            except (KeyError, NameError, pd.errors.UndefinedVariableError) as e:
+                self.skipped[rule['name']] = f"could not evaluate: {e}"
+
+        # One reduction over all rules at once
+        self.failed += masks.sum(axis=0)
+        for i in range(len(self.rules)):
+            needed = self.sample_size - len(self.samples[i])
+            if needed <= 0 or not self.failed[i]:
+                continue
+            offsets = np.flatnonzero(masks[:, i])[:needed]
+            if len(offsets):
+                sample = df.iloc[offsets].copy()
+                sample.insert(0, '_row', offsets + self.rows)
+                self.samples[i].extend(json.loads(sample.to_json(orient='records', date_format='iso')))
+
+        self.rows += len(df)
+        return self
+
+    def report(self):
+        """Structured, JSON-serialisable report of everything checked so far"""
+        rules = []
+        for i, rule in enumerate(self.rules):
+            failed = int(self.failed[i])
+            failed_pct = round(failed / self.rows * 100, 2) if self.rows else 0.0
+            threshold = rule.get('max_failed_pct')
+            skipped = self.skipped.get(rule['name'])
+            rules.append({
+                'name': rule['name'],
+                'type': rule['type'],
+                'column': rule.get('column'),
+                'failed': failed,
+                'failed_pct': failed_pct,
+                'max_failed_pct': threshold,
+                # Skipped rules are reported but don't pass or fail the run
+                'passed': None if skipped else (threshold is None or failed_pct <= threshold),
+                'skipped': skipped,
+                'samples': self.samples[i],
+            })
+        return {
+            'rows': int(self.rows),
+            'passed': all(rule['passed'] is not False for rule in rules),
+            'rules': rules,
+        }
+
+def check_dataframe(df, rules, sample_size=SAMPLE_SIZE, fail_on_threshold=False):
+    """Run rules over a whole DataFrame and return the report"""
+    report = QualityChecker(rules, sample_size, chunked=False).check(df).report()
+    if fail_on_threshold and not report['passed']:
+        raise DataQualityError(report)
+    return report
+
+def check_chunks(chunks, rules, sample_size=SAMPLE_SIZE, fail_on_threshold=False):
+    """Run rules over an iterable of DataFrames (e.g. read_csv(chunksize=...))"""
+    checker = QualityChecker(rules, sample_size)
+    for chunk in chunks:
+        checker.check(chunk)
+    report = checker.report()
+    if fail_on_threshold and not report['passed']:
+        raise DataQualityError(report)
+    return report
+
+def save_report(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Data quality report saved to {path}")
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    rng = np.random.default_rng(42)
+
+    print(f"Building {rows:,} sample customer rows...")
+    sample_df = pd.DataFrame({
+        'customer_id': rng.integers(0, rows * 10, rows),
+        'first_name': rng.choice(['John', 'Jane', '', 'Sarah'], rows),
+        'last_name': rng.choice(['Smith', 'Doe', 'Wilson', ''], rows),
+        'email': rng.choice(['john@email.com', 'mike@invalid', '', 'alice@email.com'], rows),
+        'phone': rng.choice(['01234567890', 'invalid', '', '02222222222'], rows),
+        'status': rng.choice(['active', 'inactive', 'suspended', 'unknown', 'ACTIVE'], rows),
+        'order_count': rng.integers(0, 5, rows),
+        'total_spent': rng.normal(100, 80, rows).round(2),
+    })
+
+    start = time.perf_counter()
+    quality_report = check_dataframe(sample_df, CUSTOMER_360_RULES, sample_size=2)
+    print(f"Checked {len(CUSTOMER_360_RULES)} rules in {time.perf_counter() - start:.2f}s")
+    for rule in quality_report['rules']:
+        status = 'PASS' if rule['passed'] else 'FAIL'
+        print(f"  {status} {rule['name']}: {rule['failed']:,} ({rule['failed_pct']}%)")
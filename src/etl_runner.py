@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Parallel ETL Runner
+Runs extract + transform for many transaction files across a process pool
+and merges the results into one output in a fixed (sorted file) order.
+
+- Back-pressure: only a bounded number of files are in flight or waiting
+  to be merged at any time, so memory does not grow with the file count.
+- Failure isolation: a file that fails, or kills its worker process, is
+  logged and skipped; the rest of the run carries on.
+- A combined data-quality summary is built from the per-file summaries.
+"""
+
+import os
+import glob
+import itertools
+import json
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from etl_sinks import write_batches
+from etl_transactions import EXTRACTORS, TRANSFORMED_DTYPES, extract_transactions, transform_transactions
+
+logger = logging.getLogger(__name__)
+
+# ===============================
+# DISCOVERY
+# ===============================
+
+def discover_input_files(input_dir, pattern='*'):
+    """Return the sorted list of files in input_dir that have an extractor"""
+    paths = glob.glob(os.path.join(input_dir, '**', pattern), recursive=True)
+    return sorted(path for path in paths
+                  if os.path.isfile(path) and os.path.splitext(path)[1].lower() in EXTRACTORS)
+
+# ===============================
+# WORKER
+# ===============================
+
+def quality_summary(df):
+    """Basic per-file data-quality counts"""
+    invalid = (
+        df['transaction_id'].isna()
+        | df['quantity'].isna() | (df['quantity'] <= 0)
+        | df['price_per_unit'].isna() | (df['price_per_unit'] < 0)
+    )
+    return {
+        'rows': int(len(df)),
+        'invalid_rows': int(invalid.sum()),
+        'missing': {col: int(count) for col, count in df.isna().sum().items()},
+    }
+
+def process_file(path):
+    """Extract + transform one file; runs inside a worker process"""
+    df = transform_transactions(extract_transactions(path))
+    return df, quality_summary(df)
+
+def combine_quality(summaries):
+    """Add up per-file quality summaries"""
+    combined = {'rows': 0, 'invalid_rows': 0, 'missing': {}}
+    for summary in summaries:
+        combined['rows'] += summary['rows']
+        combined['invalid_rows'] += summary['invalid_rows']
+        for col, count in summary['missing'].items():
+            combined['missing'][col] = combined['missing'].get(col, 0) + count
+    return combined
+
+# ===============================
+# RUNNER
+# ===============================
+
+def _outcome(future):
+    """(result, error) for a finished future; raises BrokenProcessPool if its worker died"""
+    try:
+        return future.result(), None
+    except BrokenProcessPool:
+        raise
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+def iter_results(paths, max_workers=None, max_pending=None):
+    """
+    Process paths in a process pool and yield (path, result, error) in the
+    same order as paths. result is process_file's (df, quality) tuple, or
+    None if the file failed, in which case error holds the message.
+
+    max_pending caps files that are running or finished but not yet
+    yielded (default: twice the worker count).
+
+    A worker that dies (e.g. OOM-killed) breaks the pool and every file
+    running in it. The pool is then rebuilt and those files are re-run one
+    at a time, so only a file that kills a worker on its own is failed.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_pending or max_workers * 2
+
+    pool = ProcessPoolExecutor(max_workers=max_workers)
+    running = {}    # future -> index into paths
+    finished = {}   # index -> (result, error), waiting to be yielded in order
+    retry = []      # indices caught in a pool crash, to be re-run on their own
+    alone = set()   # indices that have been re-run on their own
+    next_submit = 0
+    next_yield = 0
+
+    try:
+        while next_yield < len(paths):
+            try:
+                if retry:
+                    # Nothing else is submitted until the retried file has finished
+                    if not running:
+                        index = retry.pop(0)
+                        alone.add(index)
+                        running[pool.submit(process_file, paths[index])] = index
+                else:
+                    while next_submit < len(paths) and len(running) + len(finished) < max_pending:
+                        running[pool.submit(process_file, paths[next_submit])] = next_submit
+                        next_submit += 1
+
+                if next_yield not in finished:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finished[running[future]] = _outcome(future)
+                        del running[future]
+            except BrokenProcessPool:
+                # Keep whatever finished cleanly; the rest of the pool's files were lost with it
+                crashed = []
+                for future, index in running.items():
+                    try:
+                        if not future.done():
+                            raise BrokenProcessPool
+                        finished[index] = _outcome(future)
+                    except BrokenProcessPool:
+                        crashed.append(index)
+                running = {}
+
+                for index in sorted(crashed):
+                    if index in alone or len(crashed) == 1:
+                        finished[index] = (None, "BrokenProcessPool: worker process died")
+                    else:
+                        retry.append(index)
+                pool.shutdown(wait=True)
+                pool = ProcessPoolExecutor(max_workers=max_workers)
+
+            while next_yield in finished:
+                result, error = finished.pop(next_yield)
+                yield paths[next_yield], result, error
+                next_yield += 1
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def run_parallel_etl(input_dir, output_base, pattern='*', fmt='parquet',
+                     max_workers=None, max_pending=None, partition_by=None):
+    """
+    Run the transactions ETL over every matching file in input_dir and
+    return a run summary with combined data quality and any failed files.
+    """
+    paths = discover_input_files(input_dir, pattern)
+    logger.info(f"Found {len(paths)} input files in {input_dir}")
+
+    summary = {
+        'files': len(paths),
+        'files_succeeded': 0,
+        'files_failed': 0,
+        'failures': {},
+        'per_file': {},
+        'output': None,
+        'seconds': 0.0,
+    }
+    if not paths:
+        summary['quality'] = combine_quality([])
+        return summary
+
+    start = time.perf_counter()
+
+    def good_batches():
+        for path, result, error in iter_results(paths, max_workers, max_pending):
+            if error:
+                logger.error(f"Failed to process {path}: {error}")
+                summary['files_failed'] += 1
+                summary['failures'][path] = error
+                continue
+            df, quality = result
+            summary['files_succeeded'] += 1
+            summary['per_file'][path] = quality
+            yield df
+
+    # Only write once at least one file has succeeded; output stays None otherwise
+    batches = good_batches()
+    first = next(batches, None)
+    if first is not None:
+        summary['output'] = write_batches(itertools.chain([first], batches), output_base, fmt=fmt,
+                                          dtypes=TRANSFORMED_DTYPES, partition_by=partition_by)
+    else:
+        logger.warning("No input files were processed successfully; no output written")
+    summary['quality'] = combine_quality(summary['per_file'].values())
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+
+    logger.info(f"Processed {summary['files_succeeded']}/{len(paths)} files "
+                f"({summary['quality']['rows']} rows) in {summary['seconds']}s")
+    return summary
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+    parser = argparse.ArgumentParser(description='Run the transactions ETL over a directory of extract files')
+    parser.add_argument('input_dir', help='Directory containing .xml, .json and .csv transaction files')
+    parser.add_argument('--output', default='transformed_transactions', help='Output name without extension')
+    parser.add_argument('--pattern', default='*', help='Glob pattern for input files (default: *)')
+    parser.add_argument('--format', default='parquet', choices=['csv', 'parquet', 'feather'])
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help='Max files in flight or waiting to merge (default: 2 x workers)')
+    args = parser.parse_args()
+
+    run_summary = run_parallel_etl(args.input_dir, args.output, pattern=args.pattern, fmt=args.format,
+                                   max_workers=args.workers, max_pending=args.max_pending)
+    print(json.dumps({key: value for key, value in run_summary.items() if key != 'per_file'}, indent=2))
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+ETL Schemas
+Memory-efficient dtypes for the CRM, orders and support data, applied as
+soon as each DataFrame is built.
+
+- IDs become nullable Int64, so a blank ID is <NA> instead of turning
+  the whole column into Python objects (Int32 would overflow above
+  2,147,483,647); small counts use Int32
+- Low-cardinality text (status, issue_type, priority, region) becomes
+  categorical
+- Free text becomes Arrow-backed strings
+- Money stays float64; float32 is used only where ~7 significant digits
+  is plenty
+
+Values that can't be converted to a numeric type - including decimals
+and out-of-range numbers in integer columns - are kept in a
+'<column>_reject' column instead of disappearing (see etl_dates.py).
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = 'string[pyarrow]'
+except ImportError:
+    STRING_DTYPE = 'string'
+
+def as_string(series):
+    """series as the string dtype used across the ETL modules"""
+    return series.astype(STRING_DTYPE)
+
+PRIORITY_DTYPE = pd.CategoricalDtype(['low', 'medium', 'high'], ordered=True)
+
+CRM_SCHEMA = {
+    'customer_id': 'Int64',
+    'first_name': STRING_DTYPE,
+    'last_name': STRING_DTYPE,
+    'email': STRING_DTYPE,
+    'phone': STRING_DTYPE,
+    'status': 'category',
+    'region': 'category',
+}
+
+ORDERS_SCHEMA = {
+    'order_id': 'Int64',
+    'customer_id': 'Int64',
+    'cust_id': 'Int64',
+    'amount': 'float64',
+    'total': 'float64',
+}
+
+SUPPORT_SCHEMA = {
+    'ticket_id': 'Int64',
+    'customer_ref': 'Int64',
+    'issue_type': 'category',
+    'priority': PRIORITY_DTYPE,
+}
+
+CUSTOMER_360_SCHEMA = {
+    **CRM_SCHEMA,
+    'segment': 'category',
+    'order_count': 'Int32',
+    'ticket_count': 'Int32',
+    'total_spent': 'float64',
+    'data_quality_score': 'float32',
+}
+
+def _is_numeric_dtype(dtype):
+    return not isinstance(dtype, pd.CategoricalDtype) and pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(dtype))
+
+def fits_integer(numbers, dtype):
+    """True where a number is whole and inside the integer dtype's range (NaN is False)"""
+    numbers = numbers.astype('float64')
+    info = np.iinfo(pd.api.types.pandas_dtype(dtype).numpy_dtype)
+    # float(info.max) rounds up for int64, so that bound has to be exclusive
+    upper = float(info.max)
+    below_max = numbers < upper if upper != info.max else numbers <= upper
+    return (numbers % 1 == 0) & (numbers >= info.min) & below_max
+
+def cast_column(series, dtype):
+    """
+    Cast one column. Returns (cast Series, raw values that failed or None).
+    Blank strings count as missing, not as failures.
+    """
+    if not _is_numeric_dtype(dtype):
+        if isinstance(dtype, pd.CategoricalDtype) or dtype == 'category':
+            # Blank means missing, not a category of its own
+            series = series.where(as_string(series).str.strip().ne('').fillna(False), None)
+        return series.astype(dtype), None
+
+    numbers = pd.to_numeric(series, errors='coerce')
+    if pd.api.types.is_integer_dtype(pd.api.types.pandas_dtype(dtype)):
+        # Reject decimals and out-of-range values rather than letting astype raise
+        numbers = numbers.where(fits_integer(numbers, dtype))
+    blank = series.isna() | as_string(series).str.strip().eq('').fillna(True)
+    failed = numbers.isna() & ~blank
+    rejects = series.where(failed, None) if failed.any() else None
+    return numbers.astype(dtype), rejects
+
+def apply_schema(df, schema, name='data'):
+    """
+    Cast every column in schema that df has, add reject columns for
+    values that couldn't be converted, and log the memory before and
+    after for each column.
+    """
+    before = df.memory_usage(deep=True)
+    df = df.copy()
+
+    for col, dtype in schema.items():
+        if col not in df.columns:
+            continue
+        df[col], rejects = cast_column(df[col], dtype)
+        if rejects is not None:
+            df[f"{col}_reject"] = rejects.astype(STRING_DTYPE)
+            logger.warning(f"{name}.{col}: {int(rejects.notna().sum())} values could not be converted to {dtype}")
+
+    report = memory_report(before, df.memory_usage(deep=True))
+    total = report.loc['TOTAL']
+    logger.info(f"{name}: memory {int(total['before_bytes'])} -> {int(total['after_bytes'])} bytes "
+                f"({total['saving_pct']:.1f}% saved), by column:\n{report.to_string()}")
+    return df
+
+def memory_report(before, after):
+    """Per-column memory before and after (from memory_usage(deep=True))"""
+    report = pd.DataFrame({'before_bytes': before, 'after_bytes': after}).fillna(0).astype('int64')
+    report.loc['TOTAL'] = report.sum()
+    saved = report['before_bytes'] - report['after_bytes']
+    report['saving_pct'] = (saved / report['before_bytes'].where(report['before_bytes'] > 0) * 100).round(1)
+    return report
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(42)
+
+    # Built the way the ETL builds it today: from Python lists, so IDs with blanks are objects
+    ids = rng.integers(1000, 10_000_000, rows).astype(object)
+    ids[rng.integers(0, rows, rows // 100)] = ''
+    crm_df = pd.DataFrame({
+        'customer_id': ids,
+        'first_name': rng.choice(['John', 'jane', 'MIKE', '', 'Sarah'], rows).astype(object),
+        'last_name': rng.choice(['Smith', 'DOE', 'Johnson', 'Wilson', ''], rows).astype(object),
+        'email': rng.choice(['john@email.com', 'JANE@EMAIL.COM', 'mike@invalid', ''], rows).astype(object),
+        'phone': rng.choice(['01234567890', '0987654321', 'invalid', ''], rows).astype(object),
+        'status': rng.choice(['active', 'ACTIVE', 'inactive', 'suspended', ''], rows).astype(object),
+        'region': rng.choice(['North', 'South', 'East', 'West'], rows).astype(object),
+    })
+
+    # Logs the per-column memory before and after
+    apply_schema(crm_df, CRM_SCHEMA, 'crm')
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+ETL Sinks
+Writes ETL output as CSV, Parquet or Feather with explicit dtypes,
+compression and optional Hive-style partitioning (e.g. segment=Gold/).
+
+Every write goes to a temporary file (or directory) first and is renamed
+into place, so downstream jobs never see a half-written output.
+"""
+
+import os
+import bz2
+import gzip
+import lzma
+import itertools
+import shutil
+import tempfile
+import time
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+NULL_PARTITION = '__null__'
+
+# CSV compression -> (file opener, leading magic bytes)
+CSV_COMPRESSION = {
+    'gzip': (gzip.open, b'\x1f\x8b'),
+    'bz2': (bz2.open, b'BZh'),
+    'xz': (lzma.open, b'\xfd7zXZ'),
+}
+
+# ===============================
+# WRITERS
+# ===============================
+
+def write_csv(df, path, compression=None):
+    check_csv_compression(compression)
+    df.to_csv(path, index=False, compression=compression)
+
+def write_parquet(df, path, compression='snappy'):
+    df.to_parquet(path, index=False, compression=compression)
+
+def write_feather(df, path, compression='zstd'):
+    # Feather can't store a non-default index
+    df.reset_index(drop=True).to_feather(path, compression=compression)
+
+def read_csv(path, columns=None):
+    # Output files are always named .csv, so pandas can't infer compression
+    return pd.read_csv(path, usecols=columns, compression=detect_csv_compression(path))
+
+def read_parquet(path, columns=None):
+    return pd.read_parquet(path, columns=columns)
+
+def read_feather(path, columns=None):
+    return pd.read_feather(path, columns=columns)
+
+# Format name -> (writer, reader, file extension, default compression)
+SINKS = {
+    'csv': (write_csv, read_csv, '.csv', None),
+    'parquet': (write_parquet, read_parquet, '.parquet', 'snappy'),
+    'feather': (write_feather, read_feather, '.feather', 'zstd'),
+}
+
+def get_sink(fmt):
+    """Return the (writer, reader, extension, compression) tuple for a format"""
+    if fmt not in SINKS:
+        raise ValueError(f"Unknown output format '{fmt}'. Choose from: {', '.join(SINKS)}")
+    return SINKS[fmt]
+
+# ===============================
+# HELPERS
+# ===============================
+
+def check_csv_compression(compression):
+    if compression is not None and compression not in CSV_COMPRESSION:
+        raise ValueError(f"Unsupported CSV compression '{compression}'. "
+                         f"Choose from: {', '.join(CSV_COMPRESSION)}")
+
+def detect_csv_compression(path):
+    """Compression of a CSV file from its magic bytes, or None"""
+    with open(path, 'rb') as f:
+        head = f.read(6)
+    for compression, (_, magic) in CSV_COMPRESSION.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+def empty_frame(dtypes):
+    """Zero-row DataFrame with the given column dtypes"""
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in dtypes.items()})
+
+def apply_dtypes(df, dtypes):
+    """Cast the columns named in dtypes, ignoring any that are not present"""
+    if not dtypes:
+        return df
+    present = {col: dtype for col, dtype in dtypes.items() if col in df.columns}
+    return df.astype(present)
+
+def partition_dir_name(column, value):
+    """Hive-style directory name for one partition value"""
+    if pd.isna(value):
+        value = NULL_PARTITION
+    return f"{column}={str(value).replace(os.sep, '_')}"
+
+def _write_partitions(df, directory, partition_by, writer, file_name, compression):
+    """
+    Write one file per partition under directory/col=value/...
+    An empty df has no partitions, so it is written as a single file at the
+    top of directory instead; that keeps the schema (and the format) readable.
+    """
+    if df.empty:
+        writer(df, os.path.join(directory, file_name), compression)
+        return
+    data_columns = [col for col in df.columns if col not in partition_by]
+    for key, part in df.groupby(partition_by, dropna=False, observed=True, sort=True):
+        if not isinstance(key, tuple):
+            key = (key,)
+        subdir = os.path.join(directory, *[partition_dir_name(col, value)
+                                           for col, value in zip(partition_by, key)])
+        os.makedirs(subdir, exist_ok=True)
+        writer(part[data_columns], os.path.join(subdir, file_name), compression)
+
+def _default_mode(is_dir):
+    """Permissions a normal open()/mkdir() would give, i.e. 0o666/0o777 minus the umask"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return (0o777 if is_dir else 0o666) & ~umask
+
+def _replace_path(tmp_path, path):
+    """Move tmp_path over path; directories are swapped rather than merged"""
+    # mkstemp/mkdtemp create 0600/0700, which other users can't read
+    os.chmod(tmp_path, _default_mode(os.path.isdir(tmp_path)))
+    if os.path.isdir(tmp_path):
+        old_path = None
+        if os.path.exists(path):
+            old_path = tempfile.mkdtemp(dir=os.path.dirname(path), prefix='.old-')
+            os.rmdir(old_path)
+            os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        if old_path:
+            shutil.rmtree(old_path, ignore_errors=True)
+    else:
+        os.replace(tmp_path, path)
+
+def _remove_path(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.exists(path):
+        os.remove(path)
+
+# ===============================
+# PUBLIC API
+# ===============================
+
+def write_output(df, base_path, fmt='csv', dtypes=None, compression='default', partition_by=None):
+    """
+    Write df atomically and return the final output path.
+
+    base_path is the output name without extension. Without partition_by a
+    single file is written (base_path + extension); with partition_by a
+    directory is written containing one file per partition, e.g.
+    base_path/segment=Gold/part-0.parquet. Partition columns are stored in
+    the directory names, not in the files.
+    """
+    writer, _, extension, default_compression = get_sink(fmt)
+    if compression == 'default':
+        compression = default_compression
+
+    df = apply_dtypes(df, dtypes)
+    if isinstance(partition_by, str):
+        partition_by = [partition_by]
+
+    path = base_path if partition_by else base_path + extension
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    if partition_by:
+        tmp_path = tempfile.mkdtemp(dir=directory, prefix='.tmp-')
+    else:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=extension)
+        os.close(fd)
+
+    try:
+        if partition_by:
+            _write_partitions(df, tmp_path, partition_by, writer, f"part-0{extension}", compression)
+        else:
+            writer(df, tmp_path, compression)
+        _replace_path(tmp_path, path)
+    except Exception:
+        _remove_path(tmp_path)
+        raise
+
+    logger.info(f"Wrote {len(df)} records as {fmt} to {path}")
+    return path
+
+def write_batches(batches, base_path, fmt='csv', dtypes=None, compression='default', partition_by=None):
+    """
+    Stream an iterable of DataFrames to one output without holding them all
+    in memory, and return the final output path.
+
+    Unpartitioned outputs are a single file appended batch by batch.
+    Partitioned outputs get one part file per batch in each partition
+    directory. Use dtypes so every batch has the same schema; with no
+    batches at all, dtypes is also used to write an empty output.
+    """
+    _, _, extension, default_compression = get_sink(fmt)
+    if compression == 'default':
+        compression = default_compression
+    if fmt == 'csv':
+        check_csv_compression(compression)
+    if isinstance(partition_by, str):
+        partition_by = [partition_by]
+
+    batches = iter(batches)
+    first = next(batches, None)
+    if first is None:
+        if not dtypes:
+            raise ValueError("No batches to write and no dtypes to build an empty output from")
+        first = empty_frame(dtypes)
+    batches = itertools.chain([first], batches)
+
+    path = base_path if partition_by else base_path + extension
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    if partition_by:
+        tmp_path = tempfile.mkdtemp(dir=directory, prefix='.tmp-')
+    else:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=extension)
+        os.close(fd)
+
+    rows = 0
+    try:
+        if partition_by:
+            writer = get_sink(fmt)[0]
+            empty = None
+            for batch_no, batch in enumerate(batches):
+                batch = apply_dtypes(batch, dtypes)
+                if batch.empty:
+                    empty = batch
+                    continue
+                _write_partitions(batch, tmp_path, partition_by, writer,
+                                  f"part-{batch_no}{extension}", compression)
+                rows += len(batch)
+            if not rows:
+                # Only empty batches: write one empty file so the schema survives
+                _write_partitions(empty, tmp_path, partition_by, writer, f"part-0{extension}", compression)
+        else:
+            rows = _stream_to_file(batches, tmp_path, fmt, dtypes, compression)
+        _replace_path(tmp_path, path)
+    except Exception:
+        _remove_path(tmp_path)
+        raise
+
+    logger.info(f"Streamed {rows} records as {fmt} to {path}")
+    return path
+
+def _stream_to_file(batches, path, fmt, dtypes, compression):
+    """Append batches to a single CSV, Parquet or Feather (Arrow IPC) file"""
+    rows = 0
+    if fmt == 'csv':
+        opener = CSV_COMPRESSION[compression][0] if compression else open
+        with opener(path, 'wt', newline='') as f:
+            for batch_no, batch in enumerate(batches):
+                apply_dtypes(batch, dtypes).to_csv(f, index=False, header=(batch_no == 0))
+                rows += len(batch)
+        return rows
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = None
+    writer = None
+    try:
+        for batch in batches:
+            batch = apply_dtypes(batch, dtypes)
+            if schema is None:
+                schema = pa.Schema.from_pandas(batch, preserve_index=False)
+                if fmt == 'parquet':
+                    writer = pq.ParquetWriter(path, schema, compression=compression or 'none')
+                else:
+                    options = pa.ipc.IpcWriteOptions(compression=compression)
+                    writer = pa.ipc.new_file(path, schema, options=options)
+            table = pa.Table.from_pandas(batch, schema=schema, preserve_index=False)
+            writer.write_table(table)
+            rows += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+def read_output(path, columns=None, fmt=None, dtypes=None):
+    """
+    Read an output written by write_output.
+
+    columns limits the columns read from disk (column pruning); for
+    partitioned outputs, partition columns are rebuilt from directory names.
+    """
+    if fmt is None:
+        fmt = _detect_format(path)
+    _, reader, extension, _ = get_sink(fmt)
+
+    if not os.path.isdir(path):
+        return apply_dtypes(reader(path, columns), dtypes)
+
+    parts = []
+    for root, _, files in sorted(os.walk(path)):
+        for name in sorted(files):
+            if not name.endswith(extension):
+                continue
+            rel_dir = os.path.relpath(root, path)
+            partition_values = {}
+            if rel_dir != '.':
+                for piece in rel_dir.split(os.sep):
+                    col, _, value = piece.partition('=')
+                    partition_values[col] = None if value == NULL_PARTITION else value
+
+            file_path = os.path.join(root, name)
+            file_columns = None
+            if columns is not None:
+                file_columns = [col for col in columns if col not in partition_values]
+            if file_columns == []:
+                # Only partition columns wanted; read one data column for the row count
+                part = reader(file_path, read_column_names(file_path, fmt)[:1])[[]]
+            else:
+                part = reader(file_path, file_columns)
+            for col, value in partition_values.items():
+                if columns is None or col in columns:
+                    part[col] = value
+            parts.append(part)
+
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    df = pd.concat(parts, ignore_index=True)
+    if columns is not None:
+        df = df[columns]
+    return apply_dtypes(df, dtypes)
+
+def read_column_names(path, fmt):
+    """Column names stored in one output file, without reading its data"""
+    if fmt == 'csv':
+        return list(pd.read_csv(path, nrows=0).columns)
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if fmt == 'parquet':
+        return pq.read_schema(path).names
+    with pa.ipc.open_file(path) as reader:
+        return reader.schema.names
+
+def _detect_format(path):
+    candidates = [path]
+    if os.path.isdir(path):
+        candidates = [name for _, _, files in os.walk(path) for name in files]
+    for candidate in candidates:
+        for fmt, (_, _, extension, _) in SINKS.items():
+            if candidate.endswith(extension):
+                return fmt
+    raise ValueError(f"Could not detect output format for {path}")
+
+def output_size(path):
+    """Total size in bytes of a file or partitioned directory"""
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, files in os.walk(path) for name in files)
+
+# ===============================
+# BENCHMARK
+# ===============================
+
+def benchmark_formats(df, directory, formats=None, columns=None, dtypes=None, partition_by=None):
+    """
+    Compare file size, write time and read time for each format.
+    columns, if given, is also used for a pruned read.
+    """
+    results = []
+    for fmt in formats or SINKS:
+        base_path = os.path.join(directory, f"benchmark_{fmt}")
+
+        start = time.perf_counter()
+        path = write_output(df, base_path, fmt=fmt, dtypes=dtypes, partition_by=partition_by)
+        write_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        read_output(path, fmt=fmt, dtypes=dtypes)
+        read_seconds = time.perf_counter() - start
+
+        result = {
+            'format': fmt,
+            'size_mb': output_size(path) / 1024 / 1024,
+            'write_seconds': write_seconds,
+            'read_seconds': read_seconds,
+        }
+        if columns:
+            start = time.perf_counter()
+            read_output(path, columns=columns, fmt=fmt)
+            result['pruned_read_seconds'] = time.perf_counter() - start
+        results.append(result)
+
+    return pd.DataFrame(results)
+
+def make_sample_customer_360(rows, seed=42):
+    """Synthetic customer-360 view for benchmarking"""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'customer_id': np.arange(1000, 1000 + rows),
+        'first_name': rng.choice(['John', 'Jane', 'Mike', 'Sarah', 'Bob', 'Alice'], rows),
+        'last_name': rng.choice(['Smith', 'Doe', 'Johnson', 'Wilson', 'Brown', 'Cooper'], rows),
+        'status': rng.choice(['active', 'inactive', 'suspended', 'unknown'], rows),
+        'region': rng.choice(['North', 'South', 'East', 'West'], rows),
+        'segment': rng.choice(['Gold', 'Silver', 'Bronze'], rows),
+        'order_count': rng.integers(0, 50, rows),
+        'total_spent': rng.gamma(2.0, 150.0, rows).round(2),
+        'ticket_count': rng.integers(0, 10, rows),
+    })
+
+if __name__ == "__main__":
+    import sys
+
+    from etl_schema import CUSTOMER_360_SCHEMA
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s: %(message)s')
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print(f"Benchmarking output formats with {rows:,} rows...")
+    sample_df = make_sample_customer_360(rows)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = benchmark_formats(sample_df, tmp_dir, columns=['customer_id', 'total_spent'],
+                                    dtypes=CUSTOMER_360_SCHEMA)
+    print(results.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
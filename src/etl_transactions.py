@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Transactions ETL
+Extract, transform and load for the sales transaction feeds used in the
+Sales, XML and JSON notebooks.
+
+The XML extractor streams <transaction> elements with iterparse and removes
+each one from its parent after use, so memory stays flat however large the
+feed is and however deeply the transactions are wrapped.
+"""
+
+import os
+import json
+import xml.etree.ElementTree as ET
+import logging
+
+import pandas as pd
+
+from etl_schema import fits_integer
+from etl_sinks import write_batches
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50_000
+
+# Column -> dtype for every transaction batch
+TRANSACTION_DTYPES = {
+    'transaction_id': 'Int64',
+    'product': 'string',
+    'quantity': 'Int64',
+    'price_per_unit': 'float64',
+}
+
+# Column -> dtype after transform_transactions
+TRANSFORMED_DTYPES = {
+    **TRANSACTION_DTYPES,
+    'total_price': 'Float64',
+}
+
+# ===============================
+# EXTRACT
+# ===============================
+
+def to_nullable_int(values, dtype='Int64'):
+    """Coerce to a nullable integer; junk, non-integral and out-of-range values become <NA>"""
+    numbers = pd.to_numeric(values, errors='coerce').astype('float64')
+    return numbers.where(fits_integer(numbers, dtype)).astype(dtype)
+
+def make_transaction_batch(columns):
+    """Build a typed DataFrame from a dict of column -> list of raw values"""
+    df = pd.DataFrame(columns)
+    for col, dtype in TRANSACTION_DTYPES.items():
+        if col not in df.columns:
+            df[col] = pd.Series([None] * len(df), dtype=dtype)
+        elif dtype == 'string':
+            df[col] = df[col].astype(dtype)
+        elif dtype == 'Int64':
+            # Bad values (including 2.5) become missing rather than failing the whole batch
+            df[col] = to_nullable_int(df[col], dtype)
+        else:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+    return df[list(TRANSACTION_DTYPES)]
+
+def iter_xml_transactions(source, batch_size=BATCH_SIZE, tag='transaction'):
+    """
+    Stream <transaction> elements from an XML file path or file object,
+    yielding typed DataFrames of up to batch_size rows.
+    """
+    fields = list(TRANSACTION_DTYPES)
+    columns = {field: [] for field in fields}
+    rows = 0
+    open_elements = []   # path from the root to the element being parsed
+
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            open_elements.append(elem)
+            continue
+        open_elements.pop()
+        if elem.tag != tag:
+            continue
+
+        for field in fields:
+            columns[field].append(elem.findtext(field))
+        rows += 1
+
+        # Detach the finished element from its parent (whatever wrappers the
+        # feed uses) so the tree never grows
+        if open_elements:
+            open_elements[-1].remove(elem)
+
+        if rows == batch_size:
+            yield make_transaction_batch(columns)
+            columns = {field: [] for field in fields}
+            rows = 0
+
+    if rows:
+        yield make_transaction_batch(columns)
+
+def extract_xml_transactions(path):
+    """Read a whole XML transaction file into one typed DataFrame"""
+    batches = list(iter_xml_transactions(path))
+    if not batches:
+        return make_transaction_batch({})
+    return pd.concat(batches, ignore_index=True)
+
+def extract_json_transactions(path):
+    """Read a JSON array of transaction objects into a typed DataFrame"""
+    with open(path) as f:
+        records = json.load(f)
+    return make_transaction_batch(pd.DataFrame(records))
+
+def extract_csv_transactions(path):
+    """Read a CSV of transactions into a typed DataFrame"""
+    return make_transaction_batch(pd.read_csv(path, dtype=str))
+
+# File extension -> extractor
+EXTRACTORS = {
+    '.xml': extract_xml_transactions,
+    '.json': extract_json_transactions,
+    '.csv': extract_csv_transactions,
+}
+
+def extract_transactions(path):
+    """Pick the extractor for a file from its extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXTRACTORS:
+        raise ValueError(f"No extractor for '{extension}' files: {path}")
+    return EXTRACTORS[extension](path)
+
+# ===============================
+# TRANSFORM
+# ===============================
+
+def transform_transactions(df):
+    """Add total_price = quantity * price_per_unit"""
+    df['total_price'] = df['quantity'] * df['price_per_unit']
+    return df
+
+# ===============================
+# LOAD
+# ===============================
+
+def run_xml_etl(source, output_base, fmt='csv', batch_size=BATCH_SIZE, partition_by=None):
+    """Stream an XML transaction feed through the transform into a sink"""
+    batches = (transform_transactions(batch)
+               for batch in iter_xml_transactions(source, batch_size=batch_size))
+    output_path = write_batches(batches, output_base, fmt=fmt,
+                                dtypes=TRANSFORMED_DTYPES, partition_by=partition_by)
+    logger.info(f"XML ETL completed. Transformed data saved to {output_path}")
+    return output_path
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+    if len(sys.argv) < 2:
+        print("Usage: python etl_transactions.py <transactions.xml> [output_name] [csv|parquet|feather]")
+        sys.exit(1)
+
+    xml_file = sys.argv[1]
+    output_base = sys.argv[2] if len(sys.argv) > 2 else 'transformed_xml_data'
+    fmt = sys.argv[3] if len(sys.argv) > 3 else 'csv'
+    run_xml_etl(xml_file, output_base, fmt=fmt)
@@ -1,5 +1,18 @@
 import random
 import sys
+import time
+import click
+import numpy as np
+
+# Code -> (name, main pool, main picks, bonus pool, bonus picks)
+GAMES = {
+    'NL': ('Lotto', 59, 6, None, 0),
+    'SL': ('Set for Life', 47, 5, 10, 1),
+    'EM': ('EuroMillions', 50, 5, 12, 2),
+    'TB': ('Thunderball', 39, 5, 14, 1),
+}
+
+CHUNK_SIZE = 100_000
 
 def pick_and_remove(source, target):
     i = random.randrange(len(source))
@@ -19,30 +32,140 @@ def get_numbers(target, count):
 
     return selected_sorted
 
-def main():
+# ===============================
+# BULK DRAWS (NumPy)
+# ===============================
+
+def draw_many(rng, target, count, draws):
+    """
+    Draw `count` numbers from 1..target without replacement, `draws` times.
+    Returns a sorted (draws, count) uint8 array.
+    """
+    # Random keys per number; the positions of the `count` smallest keys
+    # are a uniform sample without replacement
+    keys = rng.random((draws, target), dtype=np.float32)
+    picks = np.argpartition(keys, count - 1, axis=1)[:, :count] + 1
+    picks.sort(axis=1)
+    return picks.astype(np.uint8)
+
+def draw_game(rng, code, draws):
+    """Main numbers and bonus numbers side by side, one row per draw"""
+    _, target, count, bonus_target, bonus_count = GAMES[code]
+    picks = draw_many(rng, target, count, draws)
+    if bonus_count:
+        picks = np.hstack([picks, draw_many(rng, bonus_target, bonus_count, draws)])
+    return picks
+
+def frequency_stats(counts, draws, picks_per_draw):
+    """Chi-square uniformity check for how often each number was drawn"""
+    expected = draws * picks_per_draw / len(counts)
+    chi_square = float(((counts - expected) ** 2 / expected).sum())
+    return {
+        'expected': expected,
+        'min': int(counts.min()),
+        'max': int(counts.max()),
+        'max_deviation_pct': float(abs(counts - expected).max() / expected * 100),
+        'chi_square': chi_square,
+        'dof': len(counts) - 1,
+    }
+
+def simulate(codes, draws, seed=None, output=None):
+    """
+    Generate `draws` lines for each game in chunks, collecting number
+    frequencies and optionally streaming every line to <output>_<code>.npy.
+    """
+    rng = np.random.default_rng(seed)
+    results = {}
+
+    for code in codes:
+        name, target, count, bonus_target, bonus_count = GAMES[code]
+        main_counts = np.zeros(target + 1, dtype=np.int64)
+        bonus_counts = np.zeros((bonus_target or 0) + 1, dtype=np.int64)
+
+        out = None
+        if output:
+            # .npy written chunk by chunk, so memory stays at one chunk
+            out = np.lib.format.open_memmap(f"{output}_{code}.npy", mode='w+', dtype=np.uint8,
+                                            shape=(draws, count + bonus_count))
+
+        start = time.perf_counter()
+        for offset in range(0, draws, CHUNK_SIZE):
+            size = min(CHUNK_SIZE, draws - offset)
+            picks = draw_game(rng, code, size)
+            main_counts += np.bincount(picks[:, :count].ravel(), minlength=target + 1)
+            if bonus_count:
+                bonus_counts += np.bincount(picks[:, count:].ravel(), minlength=bonus_target + 1)
+            if out is not None:
+                out[offset:offset + size] = picks
+        seconds = time.perf_counter() - start
+
+        if out is not None:
+            out.flush()
+            del out
+
+        results[code] = {
+            'name': name,
+            'seconds': seconds,
+            'draws_per_second': draws / seconds if seconds else float('inf'),
+            'main': frequency_stats(main_counts[1:], draws, count),
+            'bonus': frequency_stats(bonus_counts[1:], draws, bonus_count) if bonus_count else None,
+        }
+
+    return results
+
+def print_simulation(results, draws):
+    click.echo(f"\nSimulated {draws:,} draws per game\n")
+    for code, result in results.items():
+        click.echo(f"{code}: {result['name']} - {result['draws_per_second']:,.0f} draws/sec "
+                   f"({result['seconds']:.2f}s)")
+        for label in ['main', 'bonus']:
+            stats = result[label]
+            if stats is None:
+                continue
+            click.echo(f"  {label:>5}: expected {stats['expected']:,.0f} per number, "
+                       f"min {stats['min']:,}, max {stats['max']:,}, "
+                       f"max deviation {stats['max_deviation_pct']:.2f}%, "
+                       f"chi-square {stats['chi_square']:.1f} (dof {stats['dof']})")
+        click.echo()
+
+@click.command()
+@click.option('--simulate', 'draws', type=click.IntRange(1), default=None,
+              help='Generate this many draws per game instead of one line each')
+@click.option('--game', 'games', multiple=True, type=click.Choice(list(GAMES), case_sensitive=False),
+              help='Game to simulate (repeatable, default: all)')
+@click.option('--seed', type=int, default=None, help='Seed for reproducible simulations')
+@click.option('--output', type=click.Path(), default=None,
+              help='Stream simulated draws to <OUTPUT>_<GAME>.npy')
+def main(draws, games, seed, output):
+    """
+    Lottery number picker.
+
+    With no options, prints one line for each game. Use --simulate to
+    generate millions of draws with NumPy and report frequency statistics.
+
+    Examples:
+
+        python thumbs-up.py
+
+        python thumbs-up.py --simulate 1000000 --seed 42
+
+        python thumbs-up.py --simulate 5000000 --game EM --output draws
+    """
+    if draws:
+        codes = [code.upper() for code in games] or list(GAMES)
+        print_simulation(simulate(codes, draws, seed=seed, output=output), draws)
+        return
+
     print()
 
-    #  Lotto
-    picks = get_numbers(59, 6)
-    print(f"NL: {picks}\n")
-    
-    # Set for Life
-    picks = get_numbers(47, 5)
-    bonus = get_numbers(10, 1)
-    print(f"SL: {picks} - {bonus}\n")
-    
-    # Euromillions
-    picks = get_numbers(50, 5)
-    bonus = get_numbers(12, 2)
-    print(f"EM: {picks} - {bonus}\n")
-    
-    # Thunderball
-    picks = get_numbers(39, 5)
-    bonus = get_numbers(14, 1)
-    print(f"TB: {picks} - {bonus}\n")
-    
+    for code, (_, target, count, bonus_target, bonus_count) in GAMES.items():
+        picks = get_numbers(target, count)
+        if bonus_count:
+            bonus = get_numbers(bonus_target, bonus_count)
+            print(f"{code}: {picks} - {bonus}\n")
+        else:
+            print(f"{code}: {picks}\n")
 
 
 if __name__ == "__main__":
     main()
-